@@ -2,9 +2,23 @@
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+
+# 在导入 faster_whisper 之前设置线程数：CTranslate2 继承 OMP_NUM_THREADS，
+# 默认用满所有逻辑核（含超线程/E 核）会导致线程过订阅，物理核数通常更快
+if 'OMP_NUM_THREADS' not in os.environ:
+    try:
+        import psutil
+        os.environ['OMP_NUM_THREADS'] = str(
+            max(1, psutil.cpu_count(logical=False) or 1))
+    except ImportError:
+        pass
+
+from faster_whisper import BatchedInferencePipeline
+from faster_whisper.audio import decode_audio
 from whisper_lrc import WhisperLRCGenerator
-from utils import get_output_filename, is_audio_file
+from utils import _AUDIO_EXTS
 
 class BatchProcessor:
     """批处理器，用于递归转换目录下的音频文件"""
@@ -17,15 +31,48 @@ class BatchProcessor:
             device (str): 计算设备
             compute_type (str): 计算类型
         """
-        self.generator = WhisperLRCGenerator(
-            model_size=model_size,
-            device=device,
-            compute_type=compute_type
-        )
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self._generator = None
+        self.batched = None
         self.processed_count = 0
         self.skipped_count = 0
         self.error_count = 0
 
+    @property
+    def generator(self):
+        """转录生成器（延迟创建）
+
+        推迟到真正有文件要处理时才创建，配合 process_directory 的
+        预过滤，在"全部已存在"的续跑场景下完全不碰模型。
+        """
+        if self._generator is None:
+            self._generator = WhisperLRCGenerator(
+                model_size=self.model_size,
+                device=self.device,
+                compute_type=self.compute_type
+            )
+        return self._generator
+
+    def _needs_processing(self, audio_path, lrc_path, skip_existing):
+        """判断文件是否需要处理（LRC 不存在或强制覆盖）"""
+        return not (skip_existing and lrc_path.exists())
+
+    def _get_batched_pipeline(self):
+        """获取批量推理管线（延迟创建）
+
+        BatchedInferencePipeline 内部将音频切成 30 秒块并批量送入
+        编码器，把 N 次串行编码合并为一次批量计算。
+
+        Returns:
+            BatchedInferencePipeline: 包装当前模型的批量推理管线
+        """
+        if self.batched is None:
+            self.generator._load_model()
+            self.batched = BatchedInferencePipeline(model=self.generator.model)
+        return self.batched
+
     def find_audio_files(self, directory, recursive=True):
         """查找目录下的所有音频文件
 
@@ -34,23 +81,39 @@ class BatchProcessor:
             recursive (bool): 是否递归搜索子目录
 
         Yields:
-            tuple: (音频文件路径, 对应的 LRC 文件路径)
+            tuple: (音频文件路径, 对应的 LRC 文件路径, 文件大小)
         """
-        directory = Path(directory).resolve()
-
-        if recursive:
-            pattern = "**/*"
-        else:
-            pattern = "*"
-
-        for file_path in directory.glob(pattern):
-            if file_path.is_file() and is_audio_file(file_path.suffix.lower()):
-                # 生成对应的 LRC 文件路径（与音频文件同级目录）
-                lrc_path = file_path.with_suffix('.lrc')
-                yield file_path, lrc_path
+        # 用 os.scandir 加显式栈迭代遍历，避免 Path.glob 对每个条目的
+        # 额外 stat 和对象构造
+        stack = [str(Path(directory).resolve())]
+
+        while stack:
+            current = stack.pop()
+            try:
+                entries = os.scandir(current)
+            except OSError:
+                continue
+
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        # 先用纯字符串操作取扩展名，只为命中的音频文件构造 Path
+                        name = entry.name
+                        dot = name.rfind('.')
+                        if dot >= 0 and name[dot:].lower() in _AUDIO_EXTS:
+                            file_path = Path(entry.path)
+                            # 生成对应的 LRC 文件路径（与音频文件同级目录）
+                            lrc_path = file_path.with_suffix('.lrc')
+                            # 直接用 DirEntry 缓存的 stat，避免之后重复 stat
+                            size = entry.stat(follow_symlinks=False).st_size
+                            yield file_path, lrc_path, size
 
     def process_file(self, audio_path, lrc_path, language=None, beam_size=5,
-                    vad_filter=False, skip_existing=True):
+                    vad_filter=False, skip_existing=True, audio_data=None,
+                    batch_size=8):
         """处理单个音频文件
 
         Args:
@@ -60,6 +123,9 @@ class BatchProcessor:
             beam_size (int): Beam search 大小
             vad_filter (bool): 是否使用 VAD
             skip_existing (bool): 是否跳过已存在的文件
+            audio_data (np.ndarray, optional): 预取线程已解码的音频波形，
+                为 None 时由转录管线按路径自行解码
+            batch_size (int): 批量推理管线每批的 30 秒块数
 
         Returns:
             bool: 是否成功处理
@@ -78,14 +144,28 @@ class BatchProcessor:
             audio_str = str(audio_path)
             lrc_str = str(lrc_path)
 
-            # 执行转录
-            self.generator.transcribe_to_lrc(
-                audio_path=audio_str,
-                output_path=lrc_str,
-                language=language,
-                beam_size=beam_size,
-                vad_filter=vad_filter
-            )
+            if vad_filter:
+                # 通过批量推理管线执行转录（优先使用预取线程已解码的波形）
+                audio_input = audio_data if audio_data is not None else audio_str
+                segments, info = self._get_batched_pipeline().transcribe(
+                    audio_input,
+                    beam_size=beam_size,
+                    language=language,
+                    vad_filter=vad_filter,
+                    batch_size=batch_size
+                )
+                self.generator.write_segments_to_lrc(audio_str, lrc_str, segments)
+            else:
+                # 批量推理管线依赖 VAD 把音频切成 30 秒块，关闭 VAD 时
+                # 对超过 30 秒的音频会直接报错，回退到顺序转录路径
+                self.generator.transcribe_to_lrc(
+                    audio_path=audio_str,
+                    output_path=lrc_str,
+                    language=language,
+                    beam_size=beam_size,
+                    vad_filter=False,
+                    audio_data=audio_data
+                )
 
             self.processed_count += 1
             print(f"✓ 成功转换: {audio_path}")
@@ -98,7 +178,8 @@ class BatchProcessor:
             return False
 
     def process_directory(self, directory, recursive=True, language=None,
-                         beam_size=5, vad_filter=False, skip_existing=True):
+                         beam_size=5, vad_filter=False, skip_existing=True,
+                         batch_size=8):
         """批处理目录下的音频文件
 
         Args:
@@ -108,33 +189,80 @@ class BatchProcessor:
             beam_size (int): Beam search 大小
             vad_filter (bool): 是否使用 VAD
             skip_existing (bool): 是否跳过已存在的文件
+            batch_size (int): 批量推理管线每批的 30 秒块数
         """
         start_time = time.time()
 
-        # 查找所有音频文件
-        audio_files = list(self.find_audio_files(directory, recursive))
-
-        if not audio_files:
-            print(f"在目录 {directory} 中未找到音频文件")
-            return
-
-        print(f"找到 {len(audio_files)} 个音频文件")
         print(f"模式: {'递归' if recursive else '仅当前目录'}")
         if language:
             print(f"指定语言: {language}")
         print("-" * 60)
 
-        # 处理每个文件
-        for i, (audio_path, lrc_path) in enumerate(audio_files, 1):
-            print(f"\n[{i}/{len(audio_files)}]", end=" ")
-            self.process_file(
-                audio_path, lrc_path, language, beam_size,
-                vad_filter, skip_existing
-            )
+        # 遍历目录并预过滤：LPT 排序需要完整列表，直接同步收集
+        found = 0
+        todo = []
+        for audio_path, lrc_path, size in self.find_audio_files(directory, recursive):
+            found += 1
+            # 跳过逻辑作为提交前的预过滤
+            if not self._needs_processing(audio_path, lrc_path, skip_existing):
+                print(f"跳过已存在的文件: {lrc_path}")
+                self.skipped_count += 1
+                continue
+            todo.append((audio_path, lrc_path, size))
+
+        if found == 0:
+            print(f"在目录 {directory} 中未找到音频文件")
+            return
+
+        # 全部已存在时直接返回，不加载模型
+        if not todo:
+            print("没有需要处理的文件")
+            elapsed_time = time.time() - start_time
+            self.print_statistics(found, elapsed_time)
+            return
+
+        # LPT 调度：按文件大小从大到小处理，避免最后才发现的大文件
+        # 拖长收尾，也让平均每文件耗时的估计更早稳定
+        todo.sort(key=lambda item: item[2], reverse=True)
+
+        # 处理每个文件：当前文件转录时，预取线程解码后续文件，
+        # 把音频解码/重采样延迟隐藏在推理后面。解码后的 float32 波形
+        # 驻留在主机内存（长音频每个可达数百 MB），窗口保持小常数、
+        # 与 batch_size 无关；CUDA 下推理更快，多留一个槽即可
+        if self.device == "cuda":
+            prefetch_window = 2
+        else:
+            prefetch_window = 1
+        decode_workers = prefetch_window
+
+        futures = {}
+        with ThreadPoolExecutor(max_workers=decode_workers) as prefetcher:
+            for i, (audio_path, lrc_path, _size) in enumerate(todo):
+                # 维持预取窗口：为后续文件提交解码任务
+                for j in range(i + 1, min(i + 1 + prefetch_window, len(todo))):
+                    if j not in futures:
+                        futures[j] = prefetcher.submit(
+                            decode_audio, str(todo[j][0]))
+
+                audio_data = None
+                future = futures.pop(i, None)
+                if future is not None:
+                    try:
+                        audio_data = future.result()
+                    except Exception:
+                        # 预取解码失败则回退为按路径转录，真实错误在转录时报告
+                        audio_data = None
+
+                print(f"\n[{i + 1}/{len(todo)}]", end=" ")
+                self.process_file(
+                    audio_path, lrc_path, language, beam_size,
+                    vad_filter, skip_existing=False, audio_data=audio_data,
+                    batch_size=batch_size
+                )
 
         # 打印统计信息
         elapsed_time = time.time() - start_time
-        self.print_statistics(len(audio_files), elapsed_time)
+        self.print_statistics(found, elapsed_time)
 
     def print_statistics(self, total_files, elapsed_time):
         """打印处理统计信息"""
@@ -173,15 +301,26 @@ def main():
                        help='Whisper 模型大小 (默认: base)')
     parser.add_argument('-l', '--language',
                        help='指定语言代码 (如: zh, en, ja, ko 等)')
-    parser.add_argument('--beam-size', type=int, default=5,
-                       help='Beam search 大小 (默认: 5)')
+    parser.add_argument('--beam-size', type=int, default=1,
+                       help='Beam search 大小 (默认: 1，贪心解码最快，疑难音频上准确率略降；'
+                            '5 为束搜索，更慢但准确率略好)')
     parser.add_argument('--device', default='cpu', choices=['cpu', 'cuda'],
                        help='计算设备 (默认: cpu)')
-    parser.add_argument('--compute-type', default='int8',
-                       choices=['int8', 'float16', 'float32'],
-                       help='计算类型 (默认: int8)')
-    parser.add_argument('--vad-filter', action='store_true',
-                       help='启用语音活动检测（过滤静音部分）')
+    parser.add_argument('--compute-type', default='auto',
+                       choices=['auto', 'int8', 'int8_float16', 'int8_bfloat16',
+                                'float16', 'bfloat16', 'float32'],
+                       help='计算类型 (默认: auto，自动选择当前设备支持的最快类型：'
+                            '支持 VNNI 的 CPU 上为 int8，带 Tensor Core 的 GPU 上为 float16；'
+                            'int8_float16 在 Ampere/Ada GPU 上通常最快：int8 权重省显存带宽，'
+                            'float16 激活走 Tensor Core)')
+    parser.add_argument('--batch-size', type=int, default=8,
+                       help='批量推理每批的 30 秒块数 (默认: 8)，显存紧张时可调小')
+    parser.add_argument('--threads', type=int,
+                       help='CPU 线程数（默认: 物理核数，通过 OMP_NUM_THREADS 生效）')
+    parser.add_argument('--no-vad', dest='vad_filter', action='store_false',
+                       help='关闭语音活动检测（默认开启：跳过静音段可成比例省时；'
+                            '若 VAD 误删音量极低的人声，可用此选项回退为全量转录）')
+    parser.set_defaults(vad_filter=True)
     parser.add_argument('--no-recursive', action='store_true',
                        help='不递归处理子目录')
     parser.add_argument('--force', action='store_true',
@@ -189,6 +328,10 @@ def main():
 
     args = parser.parse_args()
 
+    # --threads 优先于自动检测的物理核数
+    if args.threads:
+        os.environ['OMP_NUM_THREADS'] = str(args.threads)
+
     # 检查目录是否存在
     if not os.path.exists(args.directory):
         print(f"错误: 目录不存在: {args.directory}")
@@ -212,5 +355,6 @@ def main():
         language=args.language,
         beam_size=args.beam_size,
         vad_filter=args.vad_filter,
-        skip_existing=not args.force
+        skip_existing=not args.force,
+        batch_size=args.batch_size
     )
\ No newline at end of file
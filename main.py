@@ -1,8 +1,20 @@
 #!/usr/bin/env python3
 """主程序入口 - 使用 faster_whisper 生成 LRC 字幕文件"""
 import argparse
+import contextlib
 import sys
 import os
+
+# 在导入 faster_whisper 之前设置线程数：CTranslate2 继承 OMP_NUM_THREADS，
+# 默认用满所有逻辑核（含超线程/E 核）会导致线程过订阅，物理核数通常更快
+if 'OMP_NUM_THREADS' not in os.environ:
+    try:
+        import psutil
+        os.environ['OMP_NUM_THREADS'] = str(
+            max(1, psutil.cpu_count(logical=False) or 1))
+    except ImportError:
+        pass
+
 from whisper_lrc import WhisperLRCGenerator
 from batch_process import BatchProcessor
 from utils import is_audio_file
@@ -19,12 +31,15 @@ def main():
   %(prog)s audio.mp3 -o out.lrc        # 指定输出文件
   %(prog)s audio.mp3 -m small          # 使用 small 模型
   %(prog)s audio.mp3 -l zh             # 指定语言为中文
-  %(prog)s audio.mp3 --vad-filter      # 启用语音活动检测
+  %(prog)s audio.mp3 --no-vad          # 关闭语音活动检测
 
   # 批处理模式
   %(prog)s --batch /path/to/audio/dir  # 递归批处理目录
   %(prog)s -b /path/to/dir --no-recursive  # 仅处理当前目录
   %(prog)s -b /path/to/dir --force    # 强制覆盖已存在的 LRC 文件
+
+  # 常驻模式（模型只加载一次，适合外部流水线逐文件调用）
+  %(prog)s --stdin-batch < tasks.tsv   # 每行: 音频路径<TAB>输出路径
         """
     )
 
@@ -42,6 +57,13 @@ def main():
         help='批处理模式：指定要处理的目录路径'
     )
 
+    group.add_argument(
+        '--stdin-batch',
+        action='store_true',
+        help='常驻模式：模型只加载一次，从标准输入逐行读取 '
+             '"音频路径<TAB>输出路径"，每行输出 OK/ERR 结果'
+    )
+
     # 可选参数
     parser.add_argument(
         '-o', '--output',
@@ -63,8 +85,9 @@ def main():
     parser.add_argument(
         '--beam-size',
         type=int,
-        default=5,
-        help='Beam search 大小 (默认: 5)'
+        default=1,
+        help='Beam search 大小 (默认: 1，贪心解码最快，疑难音频上准确率略降；'
+             '5 为束搜索，更慢但准确率略好)'
     )
 
     parser.add_argument(
@@ -76,17 +99,37 @@ def main():
 
     parser.add_argument(
         '--compute-type',
-        default='int8',
-        choices=['int8', 'float16', 'float32'],
-        help='计算类型 (默认: int8)'
+        default='auto',
+        choices=['auto', 'int8', 'int8_float16', 'int8_bfloat16',
+                 'float16', 'bfloat16', 'float32'],
+        help='计算类型 (默认: auto，自动选择当前设备支持的最快类型：'
+             '支持 VNNI 的 CPU 上为 int8，带 Tensor Core 的 GPU 上为 float16；'
+             'int8_float16 在 Ampere/Ada GPU 上通常最快：int8 权重省显存带宽，'
+             'float16 激活走 Tensor Core)'
     )
 
     parser.add_argument(
-        '--vad-filter',
-        action='store_true',
-        help='启用语音活动检测过滤静音部分'
+        '--batch-size',
+        type=int,
+        default=8,
+        help='批处理模式：批量推理每批的 30 秒块数 (默认: 8)，显存紧张时可调小'
     )
 
+    parser.add_argument(
+        '--threads',
+        type=int,
+        help='CPU 线程数（默认: 物理核数，通过 OMP_NUM_THREADS 生效）'
+    )
+
+    parser.add_argument(
+        '--no-vad',
+        dest='vad_filter',
+        action='store_false',
+        help='关闭语音活动检测（默认开启：跳过静音段可成比例省时；'
+             '若 VAD 误删音量极低的人声，可用此选项回退为全量转录）'
+    )
+    parser.set_defaults(vad_filter=True)
+
     # 批处理相关参数
     parser.add_argument(
         '--no-recursive',
@@ -108,6 +151,48 @@ def main():
 
     args = parser.parse_args()
 
+    # --threads 优先于自动检测的物理核数
+    if args.threads:
+        os.environ['OMP_NUM_THREADS'] = str(args.threads)
+
+    # 常驻模式：模型只加载一次，避免外部流水线每个文件都付一次模型加载开销
+    if args.stdin_batch:
+        generator = WhisperLRCGenerator(
+            model_size=args.model,
+            device=args.device,
+            compute_type=args.compute_type
+        )
+
+        for line in sys.stdin:
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+
+            # 每行格式：音频路径<TAB>输出路径
+            parts = line.split('\t')
+            if len(parts) != 2:
+                sys.stdout.write(f"ERR\t{line}\t每行格式应为: 音频路径<TAB>输出路径\n")
+                sys.stdout.flush()
+                continue
+
+            audio, out = parts
+            try:
+                # stdout 只输出 OK/ERR 协议行，人类可读的进度信息转到 stderr
+                with contextlib.redirect_stdout(sys.stderr):
+                    generator.transcribe_to_lrc(
+                        audio_path=audio,
+                        output_path=out,
+                        language=args.language,
+                        beam_size=args.beam_size,
+                        vad_filter=args.vad_filter
+                    )
+                sys.stdout.write(f"OK\t{out}\n")
+            except Exception as e:
+                sys.stdout.write(f"ERR\t{audio}\t{str(e)}\n")
+            sys.stdout.flush()
+
+        return 0
+
     # 单文件模式
     if args.input:
         # 检查输入文件
@@ -116,7 +201,7 @@ def main():
             return 1
 
         # 检查是否为音频文件
-        if not is_audio_file(os.path.splitext(args.input)[1]):
+        if not is_audio_file(os.path.splitext(args.input)[1].lower()):
             print(f"错误: 不支持的文件格式: {args.input}")
             return 1
 
@@ -164,7 +249,8 @@ def main():
                 language=args.language,
                 beam_size=args.beam_size,
                 vad_filter=args.vad_filter,
-                skip_existing=not args.force
+                skip_existing=not args.force,
+                batch_size=args.batch_size
             )
             return 0
         except Exception as e:
@@ -1,5 +1,15 @@
 """工具函数模块"""
 import os
+from pathlib import Path
+
+import numpy as np
+
+# 支持的音频/视频扩展名（小写），模块级 frozenset 避免每次调用重建集合
+_AUDIO_EXTS = frozenset({
+    '.mp3', '.mp4', '.wav', '.m4a', '.flac', '.aac', '.ogg',
+    '.wma', '.opus', '.mp2', '.m4b', '.m4p', '.webm', '.mkv',
+    '.avi', '.mov', '.wmv', '.flv', '.3gp'
+})
 
 def format_timestamp_lrc(seconds):
     """将秒数转换为 LRC 时间戳格式 [mm:ss.xx]
@@ -14,6 +24,24 @@ def format_timestamp_lrc(seconds):
     remaining_seconds = seconds % 60
     return f"[{minutes:02d}:{remaining_seconds:05.2f}]"
 
+def format_timestamps_lrc(seconds_list):
+    """批量将秒数转换为 LRC 时间戳格式 [mm:ss.xx]
+
+    用 NumPy 一次算完全部分钟数和余数，替代逐片段的 Python 级
+    divmod；长音频上万个时间戳时只剩格式化本身是逐元素工作。
+
+    Args:
+        seconds_list (sequence): 秒数序列
+
+    Returns:
+        list[str]: 格式化后的时间戳列表，例如 ["[01:31.47]", ...]
+    """
+    seconds = np.asarray(seconds_list, dtype=np.float64)
+    minutes = (seconds // 60).astype(np.int64)
+    remaining = seconds - minutes * 60
+    return [f"[{m:02d}:{r:05.2f}]"
+            for m, r in zip(minutes.tolist(), remaining.tolist())]
+
 def get_output_filename(input_filename):
     """根据输入音频文件名生成输出 LRC 文件名
 
@@ -26,6 +54,18 @@ def get_output_filename(input_filename):
     base_name = os.path.splitext(os.path.basename(input_filename))[0]
     return f"{base_name}.lrc"
 
+def write_lrc(lrc_path, lines):
+    """将 LRC 行一次性写入文件
+
+    先在内存中拼接全部行，再用一次 write_text 写出，避免逐行
+    write 在网络挂载上的逐次系统调用开销。
+
+    Args:
+        lrc_path (str): 输出 LRC 文件路径
+        lines (list[str]): 已格式化的 LRC 行（含元数据行）
+    """
+    Path(lrc_path).write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
 def ensure_output_directory(output_path):
     """确保输出目录存在
 
@@ -40,14 +80,9 @@ def is_audio_file(file_extension):
     """判断文件是否为音频文件
 
     Args:
-        file_extension (str): 文件扩展名（包含点号）
+        file_extension (str): 文件扩展名（包含点号，须为小写）
 
     Returns:
         bool: 是否为音频文件
     """
-    audio_extensions = {
-        '.mp3', '.mp4', '.wav', '.m4a', '.flac', '.aac', '.ogg',
-        '.wma', '.opus', '.mp2', '.m4b', '.m4p', '.webm', '.mkv',
-        '.avi', '.mov', '.wmv', '.flv', '.3gp'
-    }
-    return file_extension.lower() in audio_extensions
\ No newline at end of file
+    return file_extension in _AUDIO_EXTS
\ No newline at end of file
@@ -1,7 +1,8 @@
 """Whisper 转录和 LRC 生成核心模块"""
 from faster_whisper import WhisperModel
 import os
-from utils import format_timestamp_lrc, get_output_filename, ensure_output_directory
+from utils import (format_timestamps_lrc, get_output_filename,
+                   ensure_output_directory, write_lrc)
 
 class WhisperLRCGenerator:
     """使用 faster_whisper 生成 LRC 字幕文件"""
@@ -31,7 +32,7 @@ class WhisperLRCGenerator:
             print("模型加载完成！")
 
     def transcribe_to_lrc(self, audio_path, output_path=None, language=None,
-                          beam_size=5, vad_filter=False):
+                          beam_size=5, vad_filter=False, audio_data=None):
         """转录音频并生成 LRC 文件
 
         Args:
@@ -40,6 +41,8 @@ class WhisperLRCGenerator:
             language (str, optional): 语言代码 (如 'zh', 'en')，None 表示自动检测
             beam_size (int): Beam search 大小
             vad_filter (bool): 是否使用语音活动检测过滤静音
+            audio_data (np.ndarray, optional): 已解码的音频波形，
+                为 None 时按 audio_path 自行解码
 
         Returns:
             str: 生成的 LRC 文件路径
@@ -61,9 +64,9 @@ class WhisperLRCGenerator:
         print(f"正在转录音频: {audio_path}")
         print(f"检测到的语言: {language if language else '自动检测'}")
 
-        # 执行转录
+        # 执行转录（优先使用已解码的波形）
         segments, info = self.model.transcribe(
-            audio_path,
+            audio_data if audio_data is not None else audio_path,
             beam_size=beam_size,
             language=language,
             vad_filter=vad_filter
@@ -73,6 +76,31 @@ class WhisperLRCGenerator:
         detected_lang = info.language if info.language_probability > 0.5 else "未知"
         print(f"检测到的语言: {detected_lang} (置信度: {info.language_probability:.2f})")
 
+        # 生成并写入 LRC 内容
+        segment_count = self.write_segments_to_lrc(audio_path, output_path, segments)
+
+        print(f"转录完成！共生成 {segment_count} 个时间戳")
+        print(f"LRC 文件已保存到: {output_path}")
+
+        return output_path
+
+    def write_segments_to_lrc(self, audio_path, output_path, segments):
+        """将转录片段写入 LRC 文件
+
+        供单文件模式和批处理模式共用：只消费 segments 迭代器，
+        不关心片段来自普通转录还是批量推理管线。
+
+        Args:
+            audio_path (str): 音频文件路径（仅用于元数据）
+            output_path (str): 输出 LRC 文件路径
+            segments (iterable): 转录片段迭代器
+
+        Returns:
+            int: 写入的时间戳数量
+        """
+        # 确保输出目录存在
+        ensure_output_directory(output_path)
+
         # 生成 LRC 内容
         lrc_lines = []
 
@@ -82,28 +110,29 @@ class WhisperLRCGenerator:
         lrc_lines.append(f"[re:Whisper {self.model_size} model]")
         lrc_lines.append("")  # 空行分隔元数据
 
-        # 处理每个转录片段
+        # 先收集非空片段，再批量格式化时间戳
+        starts = []
+        texts = []
         segment_count = 0
         for segment in segments:
-            timestamp = format_timestamp_lrc(segment.start)
             text = segment.text.strip()
 
             # 跳过空文本
             if not text:
                 continue
 
-            lrc_lines.append(f"{timestamp}{text}")
+            starts.append(segment.start)
+            texts.append(text)
             segment_count += 1
 
             # 打印进度
             if segment_count % 10 == 0:
                 print(f"已处理 {segment_count} 个片段...")
 
-        # 写入文件
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lrc_lines))
+        for timestamp, text in zip(format_timestamps_lrc(starts), texts):
+            lrc_lines.append(f"{timestamp}{text}")
 
-        print(f"转录完成！共生成 {segment_count} 个时间戳")
-        print(f"LRC 文件已保存到: {output_path}")
+        # 一次性写入文件
+        write_lrc(output_path, lrc_lines)
 
-        return output_path
\ No newline at end of file
+        return segment_count
\ No newline at end of file